@@ -57,17 +57,76 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# URL de video (watch, youtu.be, embed) o un ID suelto de exactamente 11 caracteres
+_VIDEO_ID_RE = re.compile(
+    r'(?:youtube\.com\/watch\?v=|youtu\.be\/|youtube\.com\/embed\/|^(?=[a-zA-Z0-9_-]{11}$))'
+    r'([a-zA-Z0-9_-]{11})'
+)
+
 def extract_video_id(url_or_id):
     """Extrae el ID del video de una URL de YouTube o retorna el ID si ya es válido."""
-    patterns = [
-        r'(?:youtube\.com\/watch\?v=|youtu\.be\/|youtube\.com\/embed\/)([a-zA-Z0-9_-]{11})',
-        r'^([a-zA-Z0-9_-]{11})$'
-    ]
-    for pattern in patterns:
-        match = re.search(pattern, url_or_id)
-        if match:
-            return match.group(1)
-    return None
+    match = _VIDEO_ID_RE.search(url_or_id)
+    return match.group(1) if match else None
+
+# El scraper se guarda por sesión: su cliente HTTP (httplib2) no es thread-safe
+# y cada sesión de Streamlit corre en su propio hilo
+def get_scraper():
+    if 'scraper' not in st.session_state:
+        st.session_state['scraper'] = YouTubeScraper()
+    return st.session_state['scraper']
+
+# Limpiador y analizador no tienen estado mutable: una instancia para todo el servidor
+@st.cache_resource
+def get_cleaner():
+    return DataCleaner()
+
+@st.cache_resource
+def get_analyzer():
+    return SentimentAnalyzer()
+
+# Límites de las cachés de datos: cada consulta distinta guarda sus comentarios,
+# DataFrames y CSV, así que se caducan y se acota su número
+CACHE_TTL = 3600
+CACHE_MAX_ENTRIES = 20
+
+class NoCommentsError(Exception):
+    """La descarga no devolvió comentarios (video sin comentarios o error de la API)."""
+
+# Etapas del pipeline cacheadas por sus argumentos: repetir una consulta o
+# cambiar un filtro no vuelve a llamar a la API ni a recalcular nada.
+# Un resultado vacío se lanza como excepción para que no quede cacheado
+# (el scraper convierte los errores de la API en una lista vacía)
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def fetch_video_comments(video_id, max_comments):
+    comments = get_scraper().get_video_comments(video_id, max_comments=max_comments)
+    if not comments:
+        raise NoCommentsError(video_id)
+    return comments
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def fetch_channel_comments(channel_id, max_videos, comments_per_video):
+    comments = get_scraper().scrape_channel_comments(
+        channel_id,
+        max_videos=max_videos,
+        comments_per_video=comments_per_video
+    )
+    if not comments:
+        raise NoCommentsError(channel_id)
+    return comments
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def clean_comments(raw_comments):
+    return get_cleaner().clean_dataframe(pd.DataFrame(raw_comments))
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def analyze_comments(df_clean):
+    df_final = get_analyzer().analyze_dataframe(df_clean)
+    df_final['sentiment'] = df_final['sentiment'].astype('category')
+    return df_final
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def to_csv_bytes(df):
+    return df.to_csv(index=False).encode('utf-8')
 
 def main():
     # Header
@@ -99,46 +158,48 @@ def main():
         st.markdown("---")
         analyze_button = st.button("🚀 Analizar Comentarios", use_container_width=True)
     
-    # Contenido principal
+    # Guardar la consulta para que los reruns (p. ej. al cambiar el filtro)
+    # sigan mostrando los resultados, servidos desde la caché
     if analyze_button:
+        if input_type == "Video específico":
+            video_id = extract_video_id(video_input)
+            if not video_id:
+                st.error("❌ URL o ID de video inválido")
+                return
+            st.session_state['query'] = ('video', video_id, max_comments)
+        else:
+            st.session_state['query'] = ('channel', channel_input, num_videos, max_comments)
+    
+    query = st.session_state.get('query')
+    
+    # Contenido principal
+    if query:
         try:
-            scraper = YouTubeScraper()
-            cleaner = DataCleaner()
-            analyzer = SentimentAnalyzer()
-            
-            with st.spinner("🔍 Extrayendo comentarios..."):
-                if input_type == "Video específico":
-                    video_id = extract_video_id(video_input)
-                    if not video_id:
-                        st.error("❌ URL o ID de video inválido")
-                        return
-                    raw_comments = scraper.get_video_comments(video_id, max_comments=max_comments)
-                else:
-                    raw_comments = scraper.scrape_channel_comments(
-                        channel_input,
-                        max_videos=num_videos,
-                        comments_per_video=max_comments
-                    )
-            
-            if not raw_comments:
+            try:
+                with st.spinner("🔍 Extrayendo comentarios..."):
+                    if query[0] == 'video':
+                        raw_comments = fetch_video_comments(query[1], query[2])
+                    else:
+                        raw_comments = fetch_channel_comments(query[1], query[2], query[3])
+            except NoCommentsError:
                 st.warning("⚠️ No se encontraron comentarios.")
                 return
             
             with st.spinner("🧹 Limpiando datos..."):
-                df_raw = pd.DataFrame(raw_comments)
-                df_clean = cleaner.clean_dataframe(df_raw)
+                df_clean = clean_comments(raw_comments)
             
             with st.spinner("🧠 Analizando sentimientos..."):
-                df_final = analyzer.analyze_dataframe(df_clean)
+                df_final = analyze_comments(df_clean)
             
             # Métricas principales
             st.markdown("### 📊 Resumen del Análisis")
             col1, col2, col3, col4 = st.columns(4)
             
             total = len(df_final)
-            positivos = len(df_final[df_final['sentiment'] == 'Positivo'])
-            negativos = len(df_final[df_final['sentiment'] == 'Negativo'])
-            neutros = len(df_final[df_final['sentiment'] == 'Neutro'])
+            sentiment_counts = df_final['sentiment'].value_counts()
+            positivos = sentiment_counts.get('Positivo', 0)
+            negativos = sentiment_counts.get('Negativo', 0)
+            neutros = sentiment_counts.get('Neutro', 0)
             
             with col1:
                 st.metric("📝 Total Comentarios", total)
@@ -156,7 +217,6 @@ def main():
             
             with col_chart1:
                 st.markdown("#### 🥧 Distribución de Sentimientos")
-                sentiment_counts = df_final['sentiment'].value_counts()
                 colors = {'Positivo': '#00cc66', 'Neutro': '#ffcc00', 'Negativo': '#ff4444'}
                 fig_pie = px.pie(
                     values=sentiment_counts.values,
@@ -215,7 +275,7 @@ def main():
             st.dataframe(df_display, use_container_width=True, height=400)
             
             # Botón de descarga
-            csv = df_final.to_csv(index=False).encode('utf-8')
+            csv = to_csv_bytes(df_final)
             st.download_button(
                 label="📥 Descargar CSV Completo",
                 data=csv,
@@ -55,8 +55,8 @@ def main():
     print(summary)
     
     # Guardar resultado final con sentimientos
-    clean_path_with_sentiment = clean_path.replace('.csv', '_sentiment.csv')
-    df_final.to_csv(clean_path_with_sentiment, index=False)
+    clean_path_with_sentiment = clean_path.replace('.parquet', '_sentiment.parquet')
+    df_final.to_parquet(clean_path_with_sentiment, index=False, compression='snappy')
     print(f"\nAnálisis completado. Archivo final guardado en: {clean_path_with_sentiment}")
 
 if __name__ == "__main__":
@@ -1,16 +1,52 @@
 import os
 import re
 import pandas as pd
-import emoji
+
+# Patrones precompilados (se reutilizan en cada llamada a normalize_text)
+_URL_RE = re.compile(r'https?\S+|www\S+')
+_MENTION_RE = re.compile(r'@\w+')
+_WS_RE = re.compile(r'\s+')
+
+# Equivalentes para los kernels de Arrow (RE2) que usa normalize_series. En RE2
+# \w, \s y \S solo cubren ASCII, así que se escriben las clases Unicode que
+# Python usa para \w (letras, números y _) y \s (incluye NBSP, U+2000-U+200A, etc.)
+_SPACE_CLASS_RE2 = r'\s\x0b\x1c-\x1f\x{85}\p{Z}'
+_URL_RE2 = rf'https?[^{_SPACE_CLASS_RE2}]+|www[^{_SPACE_CLASS_RE2}]+'
+_MENTION_RE2 = r'@[\p{L}\p{N}_]+'
+_WS_RE2 = rf'[{_SPACE_CLASS_RE2}]+'
+
+# Emojis: secuencias keycap (1️⃣, #️⃣) completas, y bloques/códigos Unicode de
+# pictogramas, banderas (incluidas las de subdivisión con tags), símbolos
+# varios/dingbats, flechas, técnicos (⌛ ⏰), alfanuméricos encerrados (🆗),
+# ©/®/™ y sueltos, más el selector de variación y el ZWJ que los combinan.
+# Se aplica tras pasar a minúsculas, por eso incluye ⓜ (U+24DC) además de Ⓜ
+_EMOJI_RE = re.compile(
+    "[#*0-9]\uFE0F?\u20E3"
+    "|["
+    "\U0001F000-\U0001FAFF"
+    "\U00002600-\U000027BF"
+    "\U00002B00-\U00002BFF"
+    "\U00002190-\U000021FF"
+    "\U00002300-\U000023FF"
+    "\U000E0020-\U000E007F"
+    "\u00A9\u00AE\u203C\u2049\u20E3\u2122\u2139\u24C2\u24DC"
+    "\u25AA\u25AB\u25B6\u25C0\u25FB-\u25FE\u2934\u2935"
+    "\u3030\u303D\u3297\u3299"
+    "\uFE0F"
+    "\u200D"
+    "]+"
+)
 
 class DataCleaner:
     def __init__(self):
         pass
 
     def load_data(self, file_path):
-        """Carga datos desde JSON o CSV."""
+        """Carga datos desde JSON, Parquet o CSV."""
         if file_path.endswith('.json'):
             return pd.read_json(file_path)
+        if file_path.endswith('.parquet'):
+            return pd.read_parquet(file_path)
         return pd.read_csv(file_path)
 
     def normalize_text(self, text):
@@ -22,46 +58,64 @@ class DataCleaner:
         text = text.lower()
         
         # Eliminar URLs
-        text = re.sub(r'http\S+|www\S+|https\S+', '', text, flags=re.MULTILINE)
+        text = _URL_RE.sub('', text)
         
         # Eliminar menciones (@user)
-        text = re.sub(r'@\w+', '', text)
+        text = _MENTION_RE.sub('', text)
         
         # Eliminar emojis (opcional, podrías querer dejarlos para sentimiento)
         # Por ahora los quitamos para limpieza de texto pura
-        text = emoji.replace_emoji(text, replace='')
+        text = _EMOJI_RE.sub('', text)
         
         # Eliminar caracteres especiales y números (opcional, según necesidad)
         # text = re.sub(r'[^a-záéíóúñ\s]', '', text) 
         
         # Eliminar saltos de línea y espacios extra
-        text = re.sub(r'\n', ' ', text)
-        text = re.sub(r'\s+', ' ', text).strip()
+        text = _WS_RE.sub(' ', text).strip()
         
         return text
 
+    def normalize_series(self, texts):
+        """Versión vectorizada de normalize_text sobre una Serie string[pyarrow].
+
+        Con ese dtype y patrones como str (no re.Pattern) pandas usa los kernels
+        de Arrow en C++ (RE2) en lugar de iterar en Python. Los patrones de
+        URLs, menciones y espacios son las versiones RE2 definidas arriba. Única
+        diferencia conocida: la minúscula de Arrow no aplica los casos especiales
+        de Python ('İ' -> 'i' en vez de 'i̇', y 'Σ' final -> 'σ' en vez de 'ς').
+        """
+        s = texts.str.lower()
+        s = s.str.replace(_URL_RE2, '', regex=True)
+        s = s.str.replace(_MENTION_RE2, '', regex=True)
+        s = s.str.replace(_EMOJI_RE.pattern, '', regex=True)
+        s = s.str.replace(_WS_RE2, ' ', regex=True).str.strip()
+        return s
+
     def clean_dataframe(self, df):
         """Aplica todo el pipeline de limpieza a un DataFrame."""
-        # 1. Eliminar duplicados exactos
-        df = df.drop_duplicates()
-        
-        # 2. Manejo de nulos en texto
-        df = df.dropna(subset=['text'])
+        # 1-2. Nulos y duplicados por texto (aunque difieran en likes o fecha) con
+        #      una sola máscara, así el DataFrame se copia una vez y no se normalizan
+        #      ni analizan varias veces los mismos comentarios
+        mask = df['text'].notna() & ~df['text'].duplicated()
+        df = df.loc[mask].copy()
+        df['text'] = df['text'].astype('string[pyarrow]')
         
-        # 3. Aplicar normalización
-        df['clean_text'] = df['text'].apply(self.normalize_text)
+        # 3. Aplicar normalización (vectorizada con Arrow, mismos pasos que normalize_text)
+        df['clean_text'] = self.normalize_series(df['text'])
         
-        # 4. Eliminar filas donde el texto limpio quedó vacío (ej: solo emojis/URLs)
-        df = df[df['clean_text'] != ""]
+        # 4-5. Eliminar filas donde el texto limpio quedó vacío (ej: solo emojis/URLs)
+        #      y las que solo se distinguían por URLs, menciones, emojis o mayúsculas
+        keep = (df['clean_text'] != "") & ~df['clean_text'].duplicated()
+        df = df.loc[keep]
         
-        # 5. Reset index
-        df = df.reset_index(drop=True)
+        # 6. Reset index (sobre la copia ya filtrada, sin crear otra)
+        df.reset_index(drop=True, inplace=True)
         
         return df
 
-    def save_processed_data(self, df, filename='comments_clean.csv'):
-        """Guarda los datos limpios en la carpeta data/processed/."""
+    def save_processed_data(self, df, filename='comments_clean.parquet'):
+        """Guarda los datos limpios (Parquet, conserva los dtypes) en data/processed/."""
         path = os.path.join('data', 'processed', filename)
-        df.to_csv(path, index=False, encoding='utf-8')
+        df.to_parquet(path, index=False, compression='snappy')
         print(f"Datos limpios guardados en {path}")
         return path
@@ -1,17 +1,21 @@
-from textblob import TextBlob
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+import numpy as np
 import pandas as pd
 
 class SentimentAnalyzer:
     def __init__(self):
-        pass
+        self.sia = SentimentIntensityAnalyzer()
+
+    def get_polarity(self, text):
+        """Retorna la polaridad (compound de VADER), de -1 (muy negativo) a 1 (muy positivo)."""
+        return self.sia.polarity_scores(text)['compound']
 
     def get_sentiment(self, text):
         """Analiza el sentimiento y retorna una categoría."""
-        analysis = TextBlob(text)
-        # La polaridad va de -1 (muy negativo) a 1 (muy positivo)
-        if analysis.sentiment.polarity > 0.05:
+        polarity = self.get_polarity(text)
+        if polarity > 0.05:
             return 'Positivo'
-        elif analysis.sentiment.polarity < -0.05:
+        elif polarity < -0.05:
             return 'Negativo'
         else:
             return 'Neutro'
@@ -21,8 +25,14 @@ class SentimentAnalyzer:
         if text_column not in df.columns:
             raise ValueError(f"Column '{text_column}' not found in DataFrame")
         
-        df['sentiment'] = df[text_column].apply(self.get_sentiment)
-        df['polarity'] = df[text_column].apply(lambda x: TextBlob(x).sentiment.polarity)
+        # VADER solo se ejecuta una vez por texto único (comentarios repetidos
+        # como "first!" se puntúan una sola vez); la categoría se deriva de la polaridad
+        uniq = df[text_column].drop_duplicates().tolist()
+        scores = {t: self.get_polarity(t) for t in uniq}
+        pols = df[text_column].map(scores)
+        df['sentiment'] = np.where(pols > 0.05, 'Positivo',
+                                   np.where(pols < -0.05, 'Negativo', 'Neutro'))
+        df['polarity'] = pols
         return df
 
     def get_summary(self, df):
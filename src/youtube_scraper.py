@@ -1,34 +1,90 @@
 import os
+import gzip
 import json
+import time
+import tempfile
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import aiohttp
 from googleapiclient.discovery import build
 from dotenv import load_dotenv
 
 load_dotenv()
 
+COMMENT_THREADS_URL = 'https://www.googleapis.com/youtube/v3/commentThreads'
+# Peticiones simultáneas máximas contra la API (para no agotar la cuota de golpe)
+MAX_CONCURRENT_REQUESTS = 8
+# Máscaras 'fields': la API solo devuelve lo que realmente se usa (respuestas más pequeñas)
+COMMENT_THREADS_FIELDS = (
+    'nextPageToken,'
+    'items(snippet/topLevelComment/snippet(authorDisplayName,textDisplay,likeCount,publishedAt))'
+)
+PLAYLIST_ITEMS_FIELDS = 'nextPageToken,items/snippet(resourceId/videoId,title,publishedAt)'
+CHANNELS_FIELDS = 'items/contentDetails/relatedPlaylists/uploads'
+# Caché en disco de comentarios ya descargados (TTL en segundos, 0 la desactiva)
+COMMENTS_CACHE_DIR = os.path.join('.cache', 'comments')
+COMMENTS_CACHE_DEFAULT_TTL = 24 * 60 * 60
+
+
+def _read_cache_ttl():
+    """Lee COMMENTS_CACHE_TTL del entorno; si está vacía o mal escrita usa 24h."""
+    value = os.getenv('COMMENTS_CACHE_TTL', '').strip()
+    if not value:
+        return COMMENTS_CACHE_DEFAULT_TTL
+    try:
+        return int(value)
+    except ValueError:
+        print(f"Invalid COMMENTS_CACHE_TTL '{value}', using {COMMENTS_CACHE_DEFAULT_TTL} seconds")
+        return COMMENTS_CACHE_DEFAULT_TTL
+
+
+COMMENTS_CACHE_TTL = _read_cache_ttl()
+
 class YouTubeScraper:
     def __init__(self, api_key=None):
         self.api_key = api_key or os.getenv('YOUTUBE_API_KEY')
         if not self.api_key:
             raise ValueError("No API Key found. Set YOUTUBE_API_KEY in .env file.")
-        self.youtube = build('youtube', 'v3', developerKey=self.api_key)
+        # Documento de discovery empaquetado con la librería: build() no hace
+        # ninguna petición HTTP y no necesita caché de discovery en disco.
+        # Cada instancia tiene su propio cliente (httplib2 no es thread-safe)
+        self.youtube = build('youtube', 'v3', developerKey=self.api_key,
+                             static_discovery=True, cache_discovery=False)
+        # channel_id -> playlist ID de 'uploads' (o None si el canal no existe)
+        self._uploads_cache = {}
+
+    def _get_uploads_playlist_id(self, channel_id):
+        """Obtiene (y cachea) el playlist ID de 'uploads' de un canal."""
+        if channel_id in self._uploads_cache:
+            return self._uploads_cache[channel_id]
+        
+        res = self.youtube.channels().list(
+            id=channel_id,
+            part='contentDetails',
+            fields=CHANNELS_FIELDS
+        ).execute()
+        uploads_playlist_id = None
+        if res.get('items'):
+            uploads_playlist_id = res['items'][0]['contentDetails']['relatedPlaylists']['uploads']
+        self._uploads_cache[channel_id] = uploads_playlist_id
+        return uploads_playlist_id
 
     def get_channel_videos(self, channel_id):
         """Obtiene todos los video IDs de un canal."""
         videos = []
         # Primero obtener el playlist ID de 'uploads' del canal
-        res = self.youtube.channels().list(id=channel_id, part='contentDetails').execute()
-        if not res.get('items'):
+        uploads_playlist_id = self._get_uploads_playlist_id(channel_id)
+        if not uploads_playlist_id:
             return []
         
-        uploads_playlist_id = res['items'][0]['contentDetails']['relatedPlaylists']['uploads']
-        
         next_page_token = None
         while True:
             res = self.youtube.playlistItems().list(
                 playlistId=uploads_playlist_id,
                 part='snippet',
                 maxResults=50,
-                pageToken=next_page_token
+                pageToken=next_page_token,
+                fields=PLAYLIST_ITEMS_FIELDS
             ).execute()
             
             for item in res['items']:
@@ -44,38 +100,159 @@ class YouTubeScraper:
         
         return videos
 
+    def _comments_cache_path(self, video_id):
+        return os.path.join(COMMENTS_CACHE_DIR, f"{video_id}.json.gz")
+
+    def _load_comments_entry(self, video_id):
+        """Retorna la entrada cacheada del video, o una vacía si no existe o caducó.
+
+        La entrada guarda los comentarios descargados hasta ahora y el token de la
+        página siguiente, para poder ampliar la descarga sin repetir páginas.
+        """
+        empty = {'fetched_at': time.time(), 'next_page_token': None,
+                 'exhausted': False, 'comments': []}
+        path = self._comments_cache_path(video_id)
+        if COMMENTS_CACHE_TTL <= 0 or not os.path.exists(path):
+            return empty
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, EOFError, ValueError):
+            # Fichero ilegible o truncado: se ignora y se vuelve a descargar
+            return empty
+        # Una entrada legible pero con otra forma (formato antiguo, editada a mano)
+        # también se descarta, en vez de fallar luego al reanudar la descarga
+        if not isinstance(entry, dict) or not isinstance(entry.get('comments'), list) \
+                or not {'fetched_at', 'next_page_token', 'exhausted'} <= entry.keys():
+            return empty
+        # La caducidad cuenta desde la primera descarga, no desde la última ampliación
+        if time.time() - entry['fetched_at'] > COMMENTS_CACHE_TTL:
+            return empty
+        return entry
+
+    def _save_comments_entry(self, video_id, entry):
+        if COMMENTS_CACHE_TTL <= 0:
+            return
+        # Se escribe en un temporal del mismo directorio y se renombra (atómico):
+        # una escritura interrumpida o concurrente nunca deja el fichero a medias
+        tmp_path = None
+        try:
+            os.makedirs(COMMENTS_CACHE_DIR, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=COMMENTS_CACHE_DIR, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as raw, gzip.open(raw, 'wt', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, self._comments_cache_path(video_id))
+        except OSError as e:
+            print(f"Error saving comments cache for video {video_id}: {e}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _add_comments_page(self, entry, res, video_id):
+        """Añade una página de commentThreads a la entrada y actualiza su token."""
+        entry['comments'].extend(self._parse_comment_items(res.get('items', []), video_id))
+        entry['next_page_token'] = res.get('nextPageToken')
+        entry['exhausted'] = not entry['next_page_token']
+
     def get_video_comments(self, video_id, max_comments=100):
         """Obtiene comentarios de un video específico."""
-        comments = []
+        entry = self._load_comments_entry(video_id)
+        fetched = False
         try:
-            next_page_token = None
-            while len(comments) < max_comments:
+            while len(entry['comments']) < max_comments and not entry['exhausted']:
                 res = self.youtube.commentThreads().list(
                     videoId=video_id,
                     part='snippet',
                     maxResults=100,
-                    pageToken=next_page_token,
-                    textFormat='plainText'
+                    pageToken=entry['next_page_token'],
+                    textFormat='plainText',
+                    fields=COMMENT_THREADS_FIELDS
                 ).execute()
                 
-                for item in res['items']:
-                    comment = item['snippet']['topLevelComment']['snippet']
-                    comments.append({
-                        'author': comment['authorDisplayName'],
-                        'text': comment['textDisplay'],
-                        'like_count': comment['likeCount'],
-                        'published_at': comment['publishedAt'],
-                        'video_id': video_id
-                    })
-                
-                next_page_token = res.get('nextPageToken')
-                if not next_page_token or len(comments) >= max_comments:
-                    break
+                self._add_comments_page(entry, res, video_id)
+                fetched = True
                     
         except Exception as e:
             print(f"Error fetching comments for video {video_id}: {e}")
+        
+        # Solo se guardan páginas completas, así el prefijo cacheado y su token
+        # siempre son coherentes aunque la descarga se corte a medias
+        if fetched:
+            self._save_comments_entry(video_id, entry)
             
-        return comments[:max_comments]
+        return entry['comments'][:max_comments]
+
+    def _parse_comment_items(self, items, video_id):
+        """Convierte los items de commentThreads en diccionarios planos."""
+        comments = []
+        for item in items:
+            comment = item['snippet']['topLevelComment']['snippet']
+            comments.append({
+                'author': comment['authorDisplayName'],
+                'text': comment['textDisplay'],
+                'like_count': comment['likeCount'],
+                'published_at': comment['publishedAt'],
+                'video_id': video_id
+            })
+        return comments
+
+    async def _get_comments_async(self, session, semaphore, video_id, max_comments=100):
+        """Versión asíncrona de get_video_comments usando la API REST directamente."""
+        # La lectura/escritura de la caché (gzip + JSON) es bloqueante: va a un hilo
+        # para no frenar el resto de descargas del event loop
+        entry = await asyncio.to_thread(self._load_comments_entry, video_id)
+        fetched = False
+        try:
+            while len(entry['comments']) < max_comments and not entry['exhausted']:
+                params = {
+                    'videoId': video_id,
+                    'part': 'snippet',
+                    'maxResults': 100,
+                    'textFormat': 'plainText',
+                    'fields': COMMENT_THREADS_FIELDS,
+                    'key': self.api_key
+                }
+                if entry['next_page_token']:
+                    params['pageToken'] = entry['next_page_token']
+
+                async with semaphore:
+                    async with session.get(COMMENT_THREADS_URL, params=params) as resp:
+                        resp.raise_for_status()
+                        res = await resp.json()
+
+                self._add_comments_page(entry, res, video_id)
+                fetched = True
+
+        except Exception as e:
+            print(f"Error fetching comments for video {video_id}: {e}")
+
+        if fetched:
+            await asyncio.to_thread(self._save_comments_entry, video_id, entry)
+
+        comments = entry['comments'][:max_comments]
+        print(f"  Extraídos {len(comments)} comentarios del video {video_id}")
+        return comments
+
+    async def _scrape_videos_async(self, video_ids, max_comments):
+        """Descarga en paralelo los comentarios de varios videos."""
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        async with aiohttp.ClientSession() as session:
+            return await asyncio.gather(*[
+                self._get_comments_async(session, semaphore, video_id, max_comments)
+                for video_id in video_ids
+            ])
+
+    def _run_async(self, coro):
+        """Ejecuta una corrutina desde código síncrono.
+
+        Si el hilo ya tiene un event loop en marcha (Jupyter, runners async),
+        asyncio.run no puede anidarse: la corrutina se ejecuta en un hilo aparte.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coro)
+        with ThreadPoolExecutor(max_workers=1) as ex:
+            return ex.submit(asyncio.run, coro).result()
 
     def scrape_channel_comments(self, channel_id, max_videos=5, comments_per_video=50):
         """Orquestador para scrapear comentarios de múltiples videos de un canal."""
@@ -83,10 +260,15 @@ class YouTubeScraper:
         videos = self.get_channel_videos(channel_id)
         print(f"Se encontraron {len(videos)} videos. Procesando los primeros {max_videos}...")
         
+        selected = videos[:max_videos]
+        
+        print(f"Extrayendo comentarios de {len(selected)} videos en paralelo...")
+        results = self._run_async(self._scrape_videos_async(
+            [v['video_id'] for v in selected], comments_per_video
+        ))
+        
         all_comments = []
-        for v in videos[:max_videos]:
-            print(f"  Extrayendo comentarios de: {v['title']}...")
-            video_comments = self.get_video_comments(v['video_id'], max_comments=comments_per_video)
+        for video_comments in results:
             all_comments.extend(video_comments)
             
         return all_comments